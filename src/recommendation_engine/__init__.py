@@ -2,5 +2,6 @@
 
 from .config import PipelineConfig
 from .pipeline import run_pipeline
+from .publishing import RecommendationPublisher
 
-__all__ = ["PipelineConfig", "run_pipeline"]
+__all__ = ["PipelineConfig", "RecommendationPublisher", "run_pipeline"]
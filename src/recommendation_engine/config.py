@@ -13,6 +13,7 @@ class PipelineConfig:
     dataset_id: str = "devops_activity"
     activity_table: str = "team_activity"
     recommendation_table: str = "team_recommendations"
+    recommendation_staging_table: str = "team_recommendations_staging"
     feedback_topic_prefix: str = "team"
     artifact_bucket: Optional[str] = None
     model_dir: Path = Path("artifacts")
@@ -31,3 +32,7 @@ class PipelineConfig:
     @property
     def recommendation_table_fqn(self) -> str:
         return self.table_fqn(self.recommendation_table)
+
+    @property
+    def recommendation_staging_table_fqn(self) -> str:
+        return self.table_fqn(self.recommendation_staging_table)
@@ -9,22 +9,18 @@ from typing import Optional
 
 import pandas as pd
 
-try:
-    from google.cloud import bigquery
-except ImportError:  # pragma: no cover - optional dependency
-    bigquery = None  # type: ignore
-
 from .clustering import fit_clusters
 from .config import PipelineConfig
 from .data_ingestion import DataIngestion
 from .feature_engineering import build_feature_frame
+from .publishing import RecommendationPublisher
 from .recommendation import recommend_tools
 from .visualization import plot_cluster_heatmap, plot_recommendations_bar
 
 LOGGER = logging.getLogger(__name__)
 
 
-def run_pipeline(config: PipelineConfig, sample_data: Optional[Path] = None) -> None:
+def run_pipeline(config: PipelineConfig, sample_data: Optional[Path] = None, full_refresh: bool = False) -> None:
     """Execute the end-to-end analytics pipeline."""
     LOGGER.info("Starting recommendation pipeline for project %s", config.project_id)
     ingestion = DataIngestion(config=config)
@@ -56,14 +52,9 @@ def run_pipeline(config: PipelineConfig, sample_data: Optional[Path] = None) ->
     recommendation_df.to_csv(recommendation_path, index=False)
     LOGGER.info("Wrote recommendations to %s", recommendation_path)
 
-    if ingestion.client and bigquery is not None:
-        table_id = config.recommendation_table_fqn
-        LOGGER.info("Publishing recommendations to BigQuery table %s", table_id)
-        load_job_config = bigquery.LoadJobConfig(
-            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
-        )
-        upload_df = recommendation_df.rename(columns={"tool_name": "recommended_tool"})
-        ingestion.client.load_table_from_dataframe(upload_df, table_id, job_config=load_job_config).result()
+    if ingestion.client:
+        publisher = RecommendationPublisher(config=config, client=ingestion.client)
+        publisher.publish(recommendation_df, full_refresh=full_refresh)
 
     LOGGER.info("Artifacts generated: %s, %s, %s", artifact_path, heatmap_path, rec_plot_path)
 
@@ -79,6 +70,11 @@ def _cli() -> None:
     parser.add_argument("--cluster-count", type=int, default=3)
     parser.add_argument("--recommendation-count", type=int, default=5)
     parser.add_argument("--model-dir", type=Path, default=Path("artifacts"))
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Reload the whole recommendation table instead of publishing only the changed rows.",
+    )
     args = parser.parse_args()
 
     config = PipelineConfig(
@@ -89,7 +85,7 @@ def _cli() -> None:
         recommendation_count=args.recommendation_count,
         model_dir=args.model_dir,
     )
-    run_pipeline(config=config, sample_data=args.sample_data)
+    run_pipeline(config=config, sample_data=args.sample_data, full_refresh=args.full_refresh)
 
 
 if __name__ == "__main__":
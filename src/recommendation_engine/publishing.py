@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from google.api_core import exceptions as api_exceptions  # type: ignore
+    from google.cloud import bigquery
+except ImportError:  # pragma: no cover - optional dependency
+    bigquery = None  # type: ignore
+    api_exceptions = None  # type: ignore
+
+from .config import PipelineConfig
+
+LOGGER = logging.getLogger(__name__)
+
+KEY_COLUMNS = ["team_id", "tool_name"]
+VALUE_COLUMNS = ["confidence", "cluster_id"]
+SNAPSHOT_COLUMNS = KEY_COLUMNS + VALUE_COLUMNS + ["generated_at"]
+CONFIDENCE_TOLERANCE = 1e-9
+STAGING_TABLE_TTL_HOURS = 24
+
+
+@dataclass
+class RecommendationDelta:
+    inserted: pd.DataFrame
+    changed: pd.DataFrame
+    removed: pd.DataFrame
+    unchanged: pd.DataFrame
+
+    @property
+    def unchanged_count(self) -> int:
+        return len(self.unchanged)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.inserted.empty and self.changed.empty and self.removed.empty
+
+
+@dataclass
+class PublishResult:
+    mode: str
+    inserted: int
+    changed: int
+    removed: int
+    skipped: int
+
+
+def diff_recommendations(previous: pd.DataFrame, current: pd.DataFrame) -> RecommendationDelta:
+    """Compare two recommendation frames keyed on (team_id, tool_name).
+
+    Unchanged rows keep the previously published values (including ``generated_at`` when present).
+    """
+    carried_columns = [column for column in VALUE_COLUMNS + ["generated_at"] if column in previous.columns]
+    previous_values = previous[KEY_COLUMNS + carried_columns].rename(
+        columns={column: f"{column}_previous" for column in carried_columns}
+    )
+    merged = current.merge(previous_values, on=KEY_COLUMNS, how="outer", indicator=True)
+
+    matched = (merged["_merge"] == "both").to_numpy()
+    confidence_equal = np.isclose(
+        merged["confidence"].to_numpy(dtype=float),
+        merged["confidence_previous"].to_numpy(dtype=float),
+        rtol=0.0,
+        atol=CONFIDENCE_TOLERANCE,
+        equal_nan=True,
+    )
+    cluster_equal = merged["cluster_id"].eq(merged["cluster_id_previous"]).to_numpy()
+    changed_mask = matched & ~(confidence_equal & cluster_equal)
+
+    columns = current.columns.tolist()
+    inserted = merged.loc[(merged["_merge"] == "left_only").to_numpy(), columns].reset_index(drop=True)
+    changed = merged.loc[changed_mask, columns].reset_index(drop=True)
+    removed = merged.loc[(merged["_merge"] == "right_only").to_numpy(), KEY_COLUMNS].reset_index(drop=True)
+    unchanged = (
+        merged.loc[matched & ~changed_mask, KEY_COLUMNS + [f"{column}_previous" for column in carried_columns]]
+        .rename(columns={f"{column}_previous": column for column in carried_columns})
+        .reset_index(drop=True)
+    )
+
+    LOGGER.info(
+        "Recommendation delta: %s inserted, %s changed, %s removed, %s unchanged",
+        len(inserted),
+        len(changed),
+        len(removed),
+        len(unchanged),
+    )
+    return RecommendationDelta(inserted=inserted, changed=changed, removed=removed, unchanged=unchanged)
+
+
+def _normalize_timestamp(value: Any) -> Optional[pd.Timestamp]:
+    if value is None or pd.isna(value):
+        return None
+    return pd.to_datetime(value, utc=True)
+
+
+@dataclass
+class RecommendationPublisher:
+    """Publishes recommendations to BigQuery, sending only rows that changed since the last run.
+
+    The last published rows are kept per target table under ``model_dir``. A delta is only applied when
+    the target table still matches that snapshot (row count and latest ``generated_at``); otherwise the
+    table is reloaded in full.
+    """
+
+    config: PipelineConfig
+    client: Optional["bigquery.Client"] = None
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.config.model_dir / f"published_{self.config.recommendation_table_fqn}.csv"
+
+    def publish(self, recommendations: pd.DataFrame, full_refresh: bool = False) -> Optional[PublishResult]:
+        """Publish recommendations, falling back to a full reload when the snapshot cannot be trusted."""
+        if not self.client:
+            LOGGER.warning("Cannot publish recommendations because BigQuery client is unavailable.")
+            return None
+
+        previous = None if full_refresh else self.load_snapshot()
+        if previous is not None and not self._table_matches_snapshot(previous):
+            previous = None
+
+        if previous is None:
+            self._load_full(recommendations)
+            result = PublishResult(mode="full", inserted=len(recommendations), changed=0, removed=0, skipped=0)
+            snapshot = recommendations[SNAPSHOT_COLUMNS]
+        else:
+            delta = diff_recommendations(previous, recommendations)
+            if delta.is_empty:
+                LOGGER.info("Recommendations unchanged since last publish; skipping BigQuery update.")
+                result = PublishResult(mode="noop", inserted=0, changed=0, removed=0, skipped=delta.unchanged_count)
+            else:
+                self._merge_delta(delta)
+                result = PublishResult(
+                    mode="delta",
+                    inserted=len(delta.inserted),
+                    changed=len(delta.changed),
+                    removed=len(delta.removed),
+                    skipped=delta.unchanged_count,
+                )
+            snapshot = pd.concat(
+                [delta.inserted[SNAPSHOT_COLUMNS], delta.changed[SNAPSHOT_COLUMNS], delta.unchanged[SNAPSHOT_COLUMNS]],
+                ignore_index=True,
+            )
+
+        self._write_snapshot(snapshot)
+        LOGGER.info(
+            "Published recommendations to %s (%s): %s inserted, %s changed, %s removed, %s rows skipped",
+            self.config.recommendation_table_fqn,
+            result.mode,
+            result.inserted,
+            result.changed,
+            result.removed,
+            result.skipped,
+        )
+        return result
+
+    def load_snapshot(self) -> Optional[pd.DataFrame]:
+        if not self.snapshot_path.exists():
+            LOGGER.info("No published snapshot found at %s; performing full load.", self.snapshot_path)
+            return None
+        snapshot = pd.read_csv(self.snapshot_path, dtype={"team_id": str, "tool_name": str})
+        missing = set(SNAPSHOT_COLUMNS) - set(snapshot.columns)
+        if missing:
+            LOGGER.warning("Snapshot %s missing columns %s; performing full load.", self.snapshot_path, missing)
+            return None
+        snapshot["generated_at"] = pd.to_datetime(snapshot["generated_at"], utc=True)
+        return snapshot
+
+    def _write_snapshot(self, snapshot: pd.DataFrame) -> None:
+        self.snapshot_path.parent.mkdir(exist_ok=True, parents=True)
+        snapshot.to_csv(self.snapshot_path, index=False)
+
+    def _table_matches_snapshot(self, snapshot: pd.DataFrame) -> bool:
+        table_id = self.config.recommendation_table_fqn
+        query = f"""
+            SELECT COUNT(*) AS row_count, MAX(generated_at) AS max_generated_at
+            FROM `{table_id}`
+        """
+        try:
+            row = next(iter(self.client.query(query).result()))
+        except Exception as exc:  # pragma: no cover - relies on external service
+            if api_exceptions and isinstance(exc, api_exceptions.NotFound):
+                LOGGER.warning("BigQuery table %s not found; performing full load.", table_id)
+                return False
+            raise
+
+        table_count = int(row["row_count"])
+        table_latest = _normalize_timestamp(row["max_generated_at"])
+        snapshot_latest = _normalize_timestamp(snapshot["generated_at"].max())
+        if table_count != len(snapshot) or table_latest != snapshot_latest:
+            LOGGER.warning(
+                "BigQuery table %s (%s rows, latest generated_at %s) does not match snapshot %s "
+                "(%s rows, latest generated_at %s); performing full load.",
+                table_id,
+                table_count,
+                table_latest,
+                self.snapshot_path,
+                len(snapshot),
+                snapshot_latest,
+            )
+            return False
+
+        LOGGER.info(
+            "BigQuery table %s matches snapshot %s (%s rows, latest generated_at %s); trusting snapshot for delta.",
+            table_id,
+            self.snapshot_path,
+            table_count,
+            table_latest,
+        )
+        return True
+
+    def _load_job_config(self, write_disposition: str) -> Optional["bigquery.LoadJobConfig"]:
+        """Return the load job config, or None when the BigQuery SDK is absent (e.g. with a fake client)."""
+        if bigquery is None:
+            return None
+        return bigquery.LoadJobConfig(write_disposition=write_disposition)
+
+    def _load_full(self, recommendations: pd.DataFrame) -> None:
+        table_id = self.config.recommendation_table_fqn
+        LOGGER.info("Reloading BigQuery table %s with %s rows", table_id, len(recommendations))
+        upload_df = recommendations.rename(columns={"tool_name": "recommended_tool"})
+        load_config = self._load_job_config("WRITE_TRUNCATE")
+        self.client.load_table_from_dataframe(upload_df, table_id, job_config=load_config).result()
+
+    def _merge_delta(self, delta: RecommendationDelta) -> None:
+        table_id = self.config.recommendation_table_fqn
+        staging_id = f"{self.config.recommendation_staging_table_fqn}_{uuid.uuid4().hex}"
+        upserts = pd.concat([delta.inserted, delta.changed]).assign(change_type="upsert")
+        removals = delta.removed.assign(change_type="removed")
+        staged_df = pd.concat([upserts, removals], ignore_index=True)
+        staged_df["cluster_id"] = staged_df["cluster_id"].astype("Int64")
+        staged_df = staged_df.rename(columns={"tool_name": "recommended_tool"})[
+            ["team_id", "recommended_tool", "confidence", "cluster_id", "generated_at", "change_type"]
+        ]
+
+        create_query = f"""
+            CREATE TABLE `{staging_id}` (
+              team_id STRING NOT NULL,
+              recommended_tool STRING NOT NULL,
+              confidence FLOAT64,
+              cluster_id INT64,
+              generated_at TIMESTAMP,
+              change_type STRING NOT NULL
+            )
+            OPTIONS (expiration_timestamp = TIMESTAMP_ADD(CURRENT_TIMESTAMP(), INTERVAL {STAGING_TABLE_TTL_HOURS} HOUR))
+        """
+        merge_query = f"""
+            MERGE `{table_id}` AS target
+            USING `{staging_id}` AS staged
+            ON target.team_id = staged.team_id AND target.recommended_tool = staged.recommended_tool
+            WHEN MATCHED AND staged.change_type = 'removed' THEN
+              DELETE
+            WHEN MATCHED THEN
+              UPDATE SET
+                confidence = staged.confidence,
+                cluster_id = staged.cluster_id,
+                generated_at = staged.generated_at
+            WHEN NOT MATCHED BY TARGET AND staged.change_type = 'upsert' THEN
+              INSERT (team_id, recommended_tool, confidence, cluster_id, generated_at)
+              VALUES (staged.team_id, staged.recommended_tool, staged.confidence, staged.cluster_id, staged.generated_at)
+        """
+
+        LOGGER.info("Staging %s changed rows in BigQuery table %s", len(staged_df), staging_id)
+        self.client.query(create_query).result()
+        try:
+            load_config = self._load_job_config("WRITE_APPEND")
+            self.client.load_table_from_dataframe(staged_df, staging_id, job_config=load_config).result()
+            LOGGER.info("Merging staged recommendations into %s", table_id)
+            self.client.query(merge_query).result()
+        finally:
+            self.client.query(f"DROP TABLE IF EXISTS `{staging_id}`").result()
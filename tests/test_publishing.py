@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pytest
+
+from recommendation_engine.config import PipelineConfig
+from recommendation_engine.publishing import RecommendationPublisher, diff_recommendations
+
+
+class FakeJob:
+    def __init__(self, rows: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.rows = rows or []
+
+    def result(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+
+class FakeBigQueryClient:
+    """Records load/query calls and emulates the target table closely enough for MERGE deltas."""
+
+    def __init__(self, table_id: str) -> None:
+        self.table_id = table_id
+        self.table = pd.DataFrame(columns=["team_id", "recommended_tool", "confidence", "cluster_id", "generated_at"])
+        self.staged: Dict[str, pd.DataFrame] = {}
+        self.loads: List[Tuple[str, pd.DataFrame, Any]] = []
+        self.queries: List[str] = []
+
+    def load_table_from_dataframe(self, dataframe: pd.DataFrame, destination: str, job_config: Any = None) -> FakeJob:
+        self.loads.append((destination, dataframe.copy(), job_config))
+        if destination == self.table_id:
+            self.table = dataframe.copy()
+        else:
+            self.staged[destination] = dataframe.copy()
+        return FakeJob()
+
+    def query(self, query: str, job_config: Any = None) -> FakeJob:
+        self.queries.append(query)
+        statement = query.split()[0]
+        if statement == "SELECT":
+            latest = self.table["generated_at"].max() if not self.table.empty else None
+            return FakeJob([{"row_count": len(self.table), "max_generated_at": latest}])
+        if statement == "MERGE":
+            staging_id = query.split("USING `")[1].split("`")[0]
+            self._apply_merge(self.staged[staging_id])
+        if statement == "DROP":
+            staging_id = query.split("`")[1]
+            self.staged.pop(staging_id, None)
+        return FakeJob()
+
+    def _apply_merge(self, staged: pd.DataFrame) -> None:
+        keys = ["team_id", "recommended_tool"]
+        table = self.table.set_index(keys)
+        staged = staged.set_index(keys)
+        table = table.drop(index=staged.index.intersection(table.index))
+        upserts = staged[staged["change_type"] == "upsert"].drop(columns="change_type")
+        self.table = pd.concat([table, upserts]).reset_index()
+
+
+def _recommendations(rows: List[Tuple[str, str, float, int]], generated_at: str) -> pd.DataFrame:
+    frame = pd.DataFrame(rows, columns=["team_id", "tool_name", "confidence", "cluster_id"])
+    frame["generated_at"] = pd.Timestamp(generated_at, tz="UTC")
+    return frame
+
+
+BASE_ROWS = [
+    ("team-atlas", "cloud-build", 0.5, 0),
+    ("team-atlas", "artifact-registry", 0.25, 0),
+    ("team-borealis", "cloud-run", 0.4, 1),
+    ("team-cosmo", "pubsub", 0.3, 2),
+]
+
+
+@pytest.fixture
+def config(tmp_path):
+    return PipelineConfig(project_id="example-project", model_dir=tmp_path)
+
+
+@pytest.fixture
+def client(config):
+    return FakeBigQueryClient(config.recommendation_table_fqn)
+
+
+def test_first_publish_reloads_full_table(config, client):
+    publisher = RecommendationPublisher(config=config, client=client)
+
+    result = publisher.publish(_recommendations(BASE_ROWS, "2026-10-01"))
+
+    assert result.mode == "full"
+    assert result.inserted == len(BASE_ROWS)
+    assert [destination for destination, _, _ in client.loads] == [config.recommendation_table_fqn]
+    assert "recommended_tool" in client.loads[0][1].columns
+    assert publisher.snapshot_path.exists()
+    assert config.recommendation_table_fqn in publisher.snapshot_path.name
+
+
+def test_second_publish_merges_only_delta(config, client):
+    publisher = RecommendationPublisher(config=config, client=client)
+    publisher.publish(_recommendations(BASE_ROWS, "2026-10-01"))
+    client.loads.clear()
+
+    current = _recommendations(
+        [
+            ("team-atlas", "cloud-build", 0.5, 0),
+            ("team-atlas", "artifact-registry", 0.75, 0),
+            ("team-borealis", "cloud-run", 0.4, 1),
+            ("team-draco", "cloud-deploy", 0.6, 2),
+        ],
+        "2026-10-02",
+    )
+    result = publisher.publish(current)
+
+    assert (result.mode, result.inserted, result.changed, result.removed, result.skipped) == ("delta", 1, 1, 1, 2)
+    assert len(client.loads) == 1
+    staging_id, staged, _ = client.loads[0]
+    assert staging_id.startswith(config.recommendation_staging_table_fqn + "_")
+    staged_rows = sorted(zip(staged["team_id"], staged["recommended_tool"], staged["change_type"]))
+    assert staged_rows == [
+        ("team-atlas", "artifact-registry", "upsert"),
+        ("team-cosmo", "pubsub", "removed"),
+        ("team-draco", "cloud-deploy", "upsert"),
+    ]
+    assert any(query.startswith("DROP TABLE IF EXISTS") and staging_id in query for query in client.queries)
+    assert not client.staged
+
+    published = client.table.set_index(["team_id", "recommended_tool"])
+    assert len(published) == 4
+    assert published.loc[("team-atlas", "artifact-registry"), "confidence"] == 0.75
+    assert published.loc[("team-atlas", "cloud-build"), "generated_at"] == pd.Timestamp("2026-10-01", tz="UTC")
+    assert ("team-cosmo", "pubsub") not in published.index
+
+
+def test_unchanged_publish_skips_bigquery(config, client):
+    publisher = RecommendationPublisher(config=config, client=client)
+    publisher.publish(_recommendations(BASE_ROWS, "2026-10-01"))
+    client.loads.clear()
+
+    result = publisher.publish(_recommendations(BASE_ROWS, "2026-10-02"))
+
+    assert result.mode == "noop"
+    assert result.skipped == len(BASE_ROWS)
+    assert client.loads == []
+
+    # The snapshot still tracks the table, so the next delta is trusted.
+    changed = _recommendations(BASE_ROWS[:3] + [("team-cosmo", "pubsub", 0.9, 2)], "2026-10-03")
+    assert publisher.publish(changed).mode == "delta"
+
+
+def test_full_refresh_ignores_snapshot(config, client):
+    publisher = RecommendationPublisher(config=config, client=client)
+    publisher.publish(_recommendations(BASE_ROWS, "2026-10-01"))
+    client.loads.clear()
+
+    result = publisher.publish(_recommendations(BASE_ROWS, "2026-10-02"), full_refresh=True)
+
+    assert result.mode == "full"
+    assert [destination for destination, _, _ in client.loads] == [config.recommendation_table_fqn]
+
+
+def test_snapshot_is_scoped_to_target_table(config, client):
+    RecommendationPublisher(config=config, client=client).publish(_recommendations(BASE_ROWS, "2026-10-01"))
+
+    other_config = PipelineConfig(project_id="example-project", dataset_id="borealis_activity", model_dir=config.model_dir)
+    other_client = FakeBigQueryClient(other_config.recommendation_table_fqn)
+    result = RecommendationPublisher(config=other_config, client=other_client).publish(
+        _recommendations(BASE_ROWS, "2026-10-01")
+    )
+
+    assert result.mode == "full"
+    assert len(other_client.table) == len(BASE_ROWS)
+
+
+def test_table_drift_forces_full_reload(config, client):
+    publisher = RecommendationPublisher(config=config, client=client)
+    publisher.publish(_recommendations(BASE_ROWS, "2026-10-01"))
+    client.table = client.table.iloc[:2]
+    client.loads.clear()
+
+    result = publisher.publish(_recommendations(BASE_ROWS, "2026-10-02"))
+
+    assert result.mode == "full"
+    assert len(client.table) == len(BASE_ROWS)
+
+
+def test_diff_tolerates_confidence_float_noise():
+    previous = _recommendations(BASE_ROWS, "2026-10-01")
+    current = previous.copy()
+    current.loc[0, "confidence"] += 1e-12
+    current.loc[1, "confidence"] += 1e-3
+
+    delta = diff_recommendations(previous, current)
+
+    assert delta.inserted.empty
+    assert delta.removed.empty
+    assert delta.changed["tool_name"].tolist() == ["artifact-registry"]
+    assert delta.unchanged_count == 3